@@ -0,0 +1,173 @@
+import base64
+import binascii
+import hmac
+import logging
+import math
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import wraps
+from flask import request, jsonify
+from flask_login import current_user
+from app import app
+from resume_parser import process_text, extract_resume_data_from_bytes
+from resume_scorer import score_resume
+
+def api_auth_required(f):
+    """Allow access to logged-in users or to clients sending the configured API key"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        api_key = app.config.get("BATCH_API_KEY")
+        provided_key = request.headers.get("X-API-Key", "")
+        # Compare bytes, compare_digest rejects non-ASCII str
+        if api_key and hmac.compare_digest(provided_key.encode(), api_key.encode()):
+            return f(*args, **kwargs)
+        if current_user.is_authenticated:
+            return f(*args, **kwargs)
+        return jsonify({"error": "Authentication required."}), 401
+    return decorated
+
+# Shared pool so the total number of scoring threads is bounded across requests
+_executor = ThreadPoolExecutor(max_workers=app.config["BATCH_API_MAX_WORKERS"], thread_name_prefix="batch-api")
+
+class TimeBudgetExceeded(Exception):
+    """Raised when a document is reached after its request's time budget has run out"""
+
+def _bounded_option(data, name, default, maximum, integer=False):
+    """Read an optional positive numeric option from the request, capped by the app config"""
+    value = data.get(name, default)
+    allowed_types = (int,) if integer else (int, float)
+    if isinstance(value, bool) or not isinstance(value, allowed_types):
+        raise ValueError(f"'{name}' must be {'an integer' if integer else 'a number'}")
+    if not math.isfinite(value) or value <= 0:
+        raise ValueError(f"'{name}' must be a positive finite number")
+    return min(value, maximum)
+
+def _check_deadline(deadline):
+    if time.monotonic() >= deadline:
+        raise TimeBudgetExceeded()
+
+def score_document(document, keywords, deadline=math.inf):
+    """
+    Parse and score a single document from a batch request.
+
+    Args:
+        document: Dictionary with either "text" or base64 "content" plus "filename"
+        keywords: List of keywords to match against
+        deadline: time.monotonic() value after which no further step is started
+
+    Returns:
+        dict: Structured resume fields, score and matched keywords
+    """
+    _check_deadline(deadline)
+
+    if document.get("text") is not None:
+        resume_data = process_text(str(document["text"]))
+    elif document.get("content") is not None:
+        filename = document.get("filename", "")
+        try:
+            content = base64.b64decode(document["content"], validate=True)
+        except (binascii.Error, TypeError, ValueError):
+            raise ValueError("'content' is not valid base64")
+        resume_data = extract_resume_data_from_bytes(content, filename)
+    else:
+        raise ValueError("Document must contain 'text' or 'content'")
+
+    _check_deadline(deadline)
+    score, matches = score_resume(resume_data, keywords)
+
+    return {
+        "name": resume_data.get("name", "Unknown"),
+        "email": resume_data.get("email", ""),
+        "skills": resume_data.get("skills", []),
+        "education": resume_data.get("education", []),
+        "experience": resume_data.get("experience", []),
+        "score": score,
+        "matches": matches
+    }
+
+# Stateless batch scoring route
+@app.route("/api/score", methods=["POST"])
+@api_auth_required
+def api_score_batch():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object."}), 400
+
+    keywords = data.get("keywords")
+    if isinstance(keywords, str):
+        keywords = keywords.split(',')
+    if not isinstance(keywords, list):
+        return jsonify({"error": "'keywords' must be a list or comma separated string."}), 400
+    keywords = [str(k).strip().lower() for k in keywords if str(k).strip()]
+
+    documents = data.get("documents")
+    if not isinstance(documents, list) or not documents:
+        return jsonify({"error": "'documents' must be a non-empty list."}), 400
+
+    max_documents = app.config["BATCH_API_MAX_DOCUMENTS"]
+    if len(documents) > max_documents:
+        return jsonify({"error": f"At most {max_documents} documents are allowed per request."}), 400
+
+    try:
+        batch_size = _bounded_option(data, "batch_size", app.config["BATCH_API_BATCH_SIZE"],
+                                     app.config["BATCH_API_MAX_BATCH_SIZE"], integer=True)
+        time_budget = _bounded_option(data, "time_budget", app.config["BATCH_API_TIME_BUDGET"],
+                                      app.config["BATCH_API_MAX_TIME_BUDGET"])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    start = time.monotonic()
+    deadline = start + time_budget
+    results = [None] * len(documents)
+    queued = deque()
+
+    for index, document in enumerate(documents):
+        if isinstance(document, dict):
+            queued.append((index, document))
+        else:
+            results[index] = {"status": "error", "error": "Document must be a JSON object."}
+
+    # Keep at most batch_size documents in flight and stop starting new ones at the deadline
+    in_flight = {}
+    while True:
+        while queued and len(in_flight) < batch_size and time.monotonic() < deadline:
+            index, document = queued.popleft()
+            in_flight[_executor.submit(score_document, document, keywords, deadline)] = index
+
+        remaining = deadline - time.monotonic()
+        if not in_flight or remaining <= 0:
+            break
+
+        done, _ = wait(in_flight, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            index = in_flight.pop(future)
+            try:
+                results[index] = {"status": "ok", **future.result()}
+            except TimeBudgetExceeded:
+                results[index] = {"status": "timeout", "error": "Time budget exceeded."}
+            except ValueError as e:
+                results[index] = {"status": "error", "error": str(e)}
+            except Exception as e:
+                logging.error(f"Error scoring document {index}: {e}")
+                results[index] = {"status": "error", "error": "Failed to process document."}
+
+    # Documents still running stop at their next deadline check; queued ones are never started
+    for future, index in in_flight.items():
+        future.cancel()
+        results[index] = {"status": "timeout", "error": "Time budget exceeded."}
+    for index, _ in queued:
+        results[index] = {"status": "timeout", "error": "Time budget exceeded."}
+
+    for index, document in enumerate(documents):
+        if isinstance(document, dict) and "id" in document:
+            results[index] = {"id": document["id"], **results[index]}
+
+    timed_out = sum(1 for result in results if result["status"] == "timeout")
+
+    return jsonify({
+        "results": results,
+        "processed": len(results) - timed_out,
+        "timed_out": timed_out,
+        "elapsed": round(time.monotonic() - start, 3)
+    })
@@ -6,9 +6,12 @@ from werkzeug.security import check_password_hash, generate_password_hash
 from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.utils import secure_filename
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 from sqlalchemy.orm import DeclarativeBase
 import datetime
 import os.path
+from profiler import init_profiling
+from db_writer import WriteBatcher, set_sqlite_pragmas
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -23,7 +26,6 @@ db = SQLAlchemy(model_class=Base)
 # Create the Flask app
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET")
-app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)  # needed for url_for to generate with https
 
 # Configure the database
 app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///resumes.db")
@@ -31,13 +33,61 @@ app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
     "pool_recycle": 300,
     "pool_pre_ping": True,
 }
+
+# Configure tuned SQLite mode (WAL, busy timeout, optional batched resume inserts)
+app.config["SQLITE_TUNING"] = os.environ.get("SQLITE_TUNING", "1").lower() in ("1", "true", "yes")
+app.config["SQLITE_BUSY_TIMEOUT"] = int(os.environ.get("SQLITE_BUSY_TIMEOUT", 30000))  # milliseconds
+app.config["SQLITE_SYNCHRONOUS"] = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL").upper()
+# Batching only helps when one process handles uploads concurrently (e.g. gunicorn --threads)
+app.config["RESUME_WRITE_BATCHING"] = os.environ.get("RESUME_WRITE_BATCHING", "").lower() in ("1", "true", "yes")
+app.config["RESUME_WRITE_BATCH_SIZE"] = int(os.environ.get("RESUME_WRITE_BATCH_SIZE", 50))
+app.config["RESUME_WRITE_BATCH_DELAY"] = float(os.environ.get("RESUME_WRITE_BATCH_DELAY", 0.0))  # seconds to wait for more rows
+app.config["RESUME_WRITE_TIMEOUT"] = float(os.environ.get("RESUME_WRITE_TIMEOUT", 30))  # seconds
+use_sqlite_tuning = app.config["SQLITE_TUNING"] and app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite")
+if use_sqlite_tuning:
+    if app.config["SQLITE_SYNCHRONOUS"] not in {"OFF", "NORMAL", "FULL", "EXTRA", "0", "1", "2", "3"}:
+        raise ValueError(f"Invalid SQLITE_SYNCHRONOUS value: {app.config['SQLITE_SYNCHRONOUS']!r}")
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"]["connect_args"] = {
+        "timeout": app.config["SQLITE_BUSY_TIMEOUT"] / 1000,
+        "check_same_thread": False,
+    }
+
 app.config["UPLOAD_FOLDER"] = "uploads"
 app.config["MAX_CONTENT_LENGTH"] = 16 * 1024 * 1024  # 16MB max upload size
 app.config["ALLOWED_EXTENSIONS"] = {"pdf", "docx"}
 
+# Configure the stateless batch scoring API
+app.config["BATCH_API_KEY"] = os.environ.get("BATCH_API_KEY")
+app.config["BATCH_API_MAX_DOCUMENTS"] = int(os.environ.get("BATCH_API_MAX_DOCUMENTS", 100))
+app.config["BATCH_API_BATCH_SIZE"] = int(os.environ.get("BATCH_API_BATCH_SIZE", 4))  # documents processed in parallel
+app.config["BATCH_API_MAX_BATCH_SIZE"] = int(os.environ.get("BATCH_API_MAX_BATCH_SIZE", 16))
+app.config["BATCH_API_MAX_WORKERS"] = int(os.environ.get("BATCH_API_MAX_WORKERS", 8))  # shared by all requests
+app.config["BATCH_API_TIME_BUDGET"] = float(os.environ.get("BATCH_API_TIME_BUDGET", 30))  # seconds
+app.config["BATCH_API_MAX_TIME_BUDGET"] = float(os.environ.get("BATCH_API_MAX_TIME_BUDGET", 120))
+
+# Configure opt-in request profiling (no overhead unless enabled)
+app.config["PROFILING_ENABLED"] = os.environ.get("PROFILING_ENABLED", "").lower() in ("1", "true", "yes")
+app.config["PROFILING_DIR"] = os.environ.get("PROFILING_DIR", "profiles")
+app.config["PROFILING_SAMPLE_RATE"] = float(os.environ.get("PROFILING_SAMPLE_RATE", 0.0))  # fraction of requests
+app.config["PROFILING_HEADER"] = os.environ.get("PROFILING_HEADER", "X-Profile")
+app.config["PROFILING_TOKEN"] = os.environ.get("PROFILING_TOKEN")  # required header value; header ignored if unset
+app.config["PROFILING_SAMPLE_THREADS"] = os.environ.get("PROFILING_SAMPLE_THREADS", "").lower() in ("1", "true", "yes")
+
 # Initialize SQLAlchemy with the app
 db.init_app(app)
 
+# Apply the SQLite PRAGMAs to connections of this app's engine only
+if use_sqlite_tuning:
+    def on_connect(dbapi_connection, connection_record):
+        set_sqlite_pragmas(dbapi_connection, app.config["SQLITE_BUSY_TIMEOUT"], app.config["SQLITE_SYNCHRONOUS"])
+
+    with app.app_context():
+        event.listen(db.engine, "connect", on_connect)
+
+# Initialize request profiling inside ProxyFix so it records the client's address
+init_profiling(app)
+app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)  # needed for url_for to generate with https
+
 # Initialize Flask-Login
 login_manager = LoginManager()
 login_manager.init_app(app)
@@ -52,8 +102,18 @@ with app.app_context():
     from models import User, Resume, Keyword, JobPosting
     db.create_all()
 
+# Batch resume inserts into shared transactions when running on tuned SQLite
+resume_writer = None
+if use_sqlite_tuning and app.config["RESUME_WRITE_BATCHING"]:
+    resume_writer = WriteBatcher(
+        app, db,
+        max_batch_size=app.config["RESUME_WRITE_BATCH_SIZE"],
+        max_delay=app.config["RESUME_WRITE_BATCH_DELAY"]
+    )
+
 # Import other modules
 from auth import *
+import api  # noqa: F401  (registers the batch scoring routes)
 from forms import *
 from resume_parser import extract_resume_data
 from resume_scorer import score_resume
@@ -81,6 +141,11 @@ def dashboard():
 @login_required
 def upload_resume():
     form = UploadResumeForm()
+    
+    # Get all job postings for the form dropdown (also needed to validate the choice)
+    job_postings = JobPosting.query.filter_by(user_id=current_user.id).all()
+    form.job_posting.choices = [(jp.id, jp.title) for jp in job_postings]
+    
     if form.validate_on_submit():
         job_posting_id = form.job_posting.data
         
@@ -125,21 +190,16 @@ def upload_resume():
                 job_posting_id=job_posting_id
             )
             
-            db.session.add(resume)
-            db.session.commit()
+            resume_id = save_resume(resume)
             
             flash(f"Resume uploaded and scored {score}/100 successfully!", "success")
-            return redirect(url_for("view_resume", id=resume.id))
+            return redirect(url_for("view_resume", id=resume_id))
             
         except Exception as e:
             logging.error(f"Error processing resume: {e}")
             flash(f"Error processing resume: {str(e)}", "danger")
             return redirect(url_for("upload_resume"))
     
-    # Get all job postings for the form dropdown
-    job_postings = JobPosting.query.filter_by(user_id=current_user.id).all()
-    form.job_posting.choices = [(jp.id, jp.title) for jp in job_postings]
-    
     return render_template("upload_resume.html", form=form)
 
 # Job posting creation route
@@ -148,29 +208,22 @@ def upload_resume():
 def new_job_posting():
     form = JobPostingForm()
     if form.validate_on_submit():
-        # Create a new job posting
+        # Process keywords
+        keywords_text = form.keywords.data
+        keyword_list = [k.strip() for k in keywords_text.split(',') if k.strip()]
+        
+        # Create the job posting and its keywords in a single transaction;
+        # the keyword rows are inserted in one batched INSERT
         job_posting = JobPosting(
             title=form.title.data,
             description=form.description.data,
-            user_id=current_user.id
+            user_id=current_user.id,
+            keywords=[Keyword(word=keyword.lower()) for keyword in keyword_list]
         )
         
         db.session.add(job_posting)
         db.session.commit()
         
-        # Process keywords
-        keywords_text = form.keywords.data
-        keyword_list = [k.strip() for k in keywords_text.split(',') if k.strip()]
-        
-        for keyword in keyword_list:
-            kw = Keyword(
-                word=keyword.lower(),
-                job_posting_id=job_posting.id
-            )
-            db.session.add(kw)
-        
-        db.session.commit()
-        
         flash(f"Job posting '{form.title.data}' created successfully!", "success")
         return redirect(url_for("dashboard"))
     
@@ -220,6 +273,15 @@ def admin_dashboard():
     
     return render_template("admin_dashboard.html", job_postings=job_postings, resumes=resumes)
 
+# Helper function to insert a resume, through the write batcher when enabled
+def save_resume(resume):
+    if resume_writer is not None:
+        return resume_writer.submit(resume, timeout=app.config["RESUME_WRITE_TIMEOUT"])
+    
+    db.session.add(resume)
+    db.session.commit()
+    return resume.id
+
 # Helper function to check if file extension is allowed
 def allowed_file(filename):
     return '.' in filename and \
@@ -0,0 +1,131 @@
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+def set_sqlite_pragmas(dbapi_connection, busy_timeout, synchronous):
+    """Apply WAL mode and lock/sync settings to a new SQLite connection"""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+
+    cursor = dbapi_connection.cursor()
+    try:
+        # WAL lets readers proceed while a single writer commits
+        cursor.execute("PRAGMA journal_mode=WAL")
+        # Wait for locks instead of failing with "database is locked"
+        cursor.execute(f"PRAGMA busy_timeout={int(busy_timeout)}")
+        # NORMAL is durable in WAL mode except against power loss, and avoids an fsync per commit
+        cursor.execute(f"PRAGMA synchronous={synchronous}")
+    finally:
+        cursor.close()
+
+class WriteBatcher:
+    """
+    Group inserts from many requests into a single transaction.
+
+    Callers submit new model instances and block until they are committed.
+    A background thread takes up to max_batch_size pending instances,
+    optionally waiting up to max_delay seconds for more to arrive, and
+    commits them together so SQLite pays for one write lock and one sync
+    per batch. Rows queued while a batch commits form the next batch.
+    """
+
+    def __init__(self, app, db, max_batch_size=50, max_delay=0.0):
+        self.app = app
+        self.db = db
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def submit(self, instance, timeout=30):
+        """
+        Insert a model instance through the batch writer.
+
+        Args:
+            instance: New (transient) model instance to insert
+            timeout: Seconds to wait for the writer to pick up the row before giving up
+
+        Returns:
+            int: Primary key of the committed row
+        """
+        self._ensure_started()
+        future = Future()
+        self._queue.put((instance, future))
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # Drop the row if the writer has not picked it up yet
+            if future.cancel():
+                raise TimeoutError("Timed out waiting for the database write")
+        # The row is already being written, so report its real outcome rather
+        # than an error that would make the caller retry and insert it twice.
+        # The writer resolves every row it picks up and SQLite's busy timeout
+        # bounds the write, so this wait ends.
+        return future.result()
+
+    def _ensure_started(self):
+        # Started lazily so the thread is created after any server fork
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="write-batcher", daemon=True)
+                self._thread.start()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        # Skip rows whose callers already timed out
+        return [item for item in batch if item[1].set_running_or_notify_cancel()]
+
+    def _run(self):
+        while True:
+            batch = []
+            try:
+                batch = self._next_batch()
+                if batch:
+                    # The app context scopes the session, which is removed when it ends
+                    with self.app.app_context():
+                        self._write_batch(batch)
+            except Exception as e:
+                # Keep the thread alive and fail every row that was not written
+                logging.error(f"Error in write batcher: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _write_batch(self, batch):
+        try:
+            self._write(batch)
+        except Exception as e:
+            logging.error(f"Error writing batch, retrying rows individually: {e}")
+            self.db.session.rollback()
+            for item in batch:
+                try:
+                    self._write([item])
+                except Exception as item_error:
+                    self.db.session.rollback()
+                    item[1].set_exception(item_error)
+
+    def _write(self, batch):
+        session = self.db.session
+        session.add_all([instance for instance, _ in batch])
+        # Read the ids after the flush, before commit expires the instances
+        session.flush()
+        ids = [instance.id for instance, _ in batch]
+        session.commit()
+        for (_, future), instance_id in zip(batch, ids):
+            future.set_result(instance_id)
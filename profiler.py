@@ -0,0 +1,207 @@
+import cProfile
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+
+class StackSampler(threading.Thread):
+    """
+    Periodically sample the stacks of all threads in the process.
+
+    cProfile only sees the thread that enabled it, so work handed off to
+    other threads (the batch API pool, the resume write batcher) is only
+    visible through sampling. Samples are kept as collapsed stacks
+    ("thread;outer;...;inner count"), the input format of flamegraph tools.
+    """
+
+    def __init__(self, interval=0.005):
+        super().__init__(name="profiler-sampler", daemon=True)
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        names = {}
+        while not self._stop_event.wait(self.interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == self.ident:
+                    continue
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                thread_name = names.get(thread_id, str(thread_id))
+                self.stacks[";".join([thread_name] + frames[::-1])] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+class ProfiledResponse:
+    """Response iterable that keeps profiling while the body is consumed and saves the profile on close()"""
+
+    def __init__(self, middleware, app_iter, profile):
+        self.middleware = middleware
+        self.app_iter = iter(app_iter)
+        self.close_app_iter = getattr(app_iter, "close", None)
+        self.profile = profile
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        self.profile.profiler.enable()
+        try:
+            return next(self.app_iter)
+        finally:
+            self.profile.profiler.disable()
+
+    def close(self):
+        try:
+            if self.close_app_iter is not None:
+                self.profile.profiler.enable()
+                try:
+                    self.close_app_iter()
+                finally:
+                    self.profile.profiler.disable()
+        finally:
+            self.middleware.finish(self.profile)
+
+class _RequestProfile:
+    def __init__(self, environ, sample_threads):
+        self.environ = environ
+        self.profiler = cProfile.Profile()
+        self.sampler = StackSampler() if sample_threads else None
+        self.status = None
+        self.start = time.perf_counter()
+
+class RequestProfilerMiddleware:
+    """
+    WSGI middleware that profiles selected requests with cProfile.
+
+    A request is profiled when it carries the configured header with the
+    matching token, or when it is picked by the sampling rate. Each profile
+    is written to the output directory as a .prof file (loadable with
+    pstats/snakeviz) next to a .json file with the request metadata. With
+    sample_threads enabled, a .collapsed file with stack samples of all
+    threads is written as well.
+    """
+
+    def __init__(self, wsgi_app, profile_dir, sample_rate=0.0, header="X-Profile", token=None,
+                 sample_threads=False):
+        self.wsgi_app = wsgi_app
+        self.profile_dir = profile_dir
+        self.sample_rate = sample_rate
+        self.header_key = "HTTP_" + header.upper().replace("-", "_")
+        self.token = token
+        self.sample_threads = sample_threads
+        # Only one cProfile profiler can be active per interpreter at a time
+        self._lock = threading.Lock()
+
+        if not os.path.exists(self.profile_dir):
+            os.makedirs(self.profile_dir)
+
+    def should_profile(self, environ):
+        """Decide whether the current request should be profiled"""
+        header_value = environ.get(self.header_key)
+        # Header-triggered profiling writes to disk on demand, so it requires the token
+        # Compare bytes, compare_digest rejects non-ASCII str
+        if header_value and self.token and hmac.compare_digest(header_value.encode(), self.token.encode()):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def __call__(self, environ, start_response):
+        if not self.should_profile(environ) or not self._lock.acquire(blocking=False):
+            return self.wsgi_app(environ, start_response)
+
+        profile = _RequestProfile(environ, self.sample_threads)
+
+        def profiled_start_response(status, headers, exc_info=None):
+            profile.status = status
+            return start_response(status, headers, exc_info)
+
+        if profile.sampler is not None:
+            profile.sampler.start()
+
+        # The lock and profile are released in finish(), once the server closes the response
+        profile.profiler.enable()
+        try:
+            app_iter = self.wsgi_app(environ, profiled_start_response)
+        except BaseException:
+            profile.profiler.disable()
+            self.finish(profile)
+            raise
+        profile.profiler.disable()
+
+        return ProfiledResponse(self, app_iter, profile)
+
+    def finish(self, profile):
+        """Stop sampling, save the profile and allow the next request to be profiled"""
+        try:
+            if profile.sampler is not None:
+                profile.sampler.stop()
+            self.dump(profile, time.perf_counter() - profile.start)
+        finally:
+            self._lock.release()
+
+    def dump(self, profile, elapsed):
+        """Write the profile and its request metadata to the output directory"""
+        environ = profile.environ
+        timestamp = datetime.utcnow()
+        # The path is client controlled, so keep only filename-safe characters
+        path = re.sub(r"[^A-Za-z0-9._-]", "_", environ.get("PATH_INFO", "/").strip("/").replace("/", "."))[:80] or "root"
+        name = f"{timestamp:%Y%m%dT%H%M%S}.{environ.get('REQUEST_METHOD', 'GET')}.{path}.{elapsed * 1000:.0f}ms.{uuid.uuid4().hex[:8]}"
+
+        metadata = {
+            "method": environ.get("REQUEST_METHOD"),
+            "path": environ.get("PATH_INFO"),
+            "query_string": environ.get("QUERY_STRING"),
+            "status": profile.status,
+            "elapsed_seconds": round(elapsed, 6),
+            "remote_addr": environ.get("REMOTE_ADDR"),
+            "user_agent": environ.get("HTTP_USER_AGENT"),
+            "content_length": environ.get("CONTENT_LENGTH"),
+            "timestamp": timestamp.isoformat(),
+            "pid": os.getpid()
+        }
+
+        try:
+            profile.profiler.dump_stats(os.path.join(self.profile_dir, name + ".prof"))
+            with open(os.path.join(self.profile_dir, name + ".json"), "w") as f:
+                json.dump(metadata, f, indent=2)
+            if profile.sampler is not None:
+                with open(os.path.join(self.profile_dir, name + ".collapsed"), "w") as f:
+                    for stack, count in profile.sampler.stacks.items():
+                        f.write(f"{stack} {count}\n")
+            logging.info(f"Saved request profile {name}")
+        except (OSError, ValueError) as e:
+            logging.error(f"Error saving request profile: {e}")
+
+def init_profiling(app):
+    """Wrap the app with the request profiler if profiling is enabled in the config"""
+    if not app.config.get("PROFILING_ENABLED"):
+        return
+
+    if not app.config["PROFILING_TOKEN"]:
+        logging.warning(f"PROFILING_TOKEN is not set, the {app.config['PROFILING_HEADER']} header is ignored")
+
+    app.wsgi_app = RequestProfilerMiddleware(
+        app.wsgi_app,
+        profile_dir=app.config["PROFILING_DIR"],
+        sample_rate=app.config["PROFILING_SAMPLE_RATE"],
+        header=app.config["PROFILING_HEADER"],
+        token=app.config["PROFILING_TOKEN"],
+        sample_threads=app.config["PROFILING_SAMPLE_THREADS"]
+    )
+    logging.info(f"Request profiling enabled, writing profiles to {app.config['PROFILING_DIR']}")
@@ -1,3 +1,4 @@
+import io
 import os
 import re
 import logging
@@ -31,6 +32,27 @@ def extract_resume_data(file_path):
     else:
         raise ValueError(f"Unsupported file format: {file_ext}")
 
+def extract_resume_data_from_bytes(content, filename):
+    """
+    Extract data from in-memory resume content (PDF or DOCX).
+    
+    Args:
+        content: Raw bytes of the resume file
+        filename: Original file name, used to detect the format
+        
+    Returns:
+        dict: Dictionary containing extracted resume data
+    """
+    file_ext = os.path.splitext(filename)[1].lower()
+    
+    # PdfReader and docx.Document both accept file-like objects
+    if file_ext == '.pdf':
+        return extract_from_pdf(io.BytesIO(content))
+    elif file_ext == '.docx':
+        return extract_from_docx(io.BytesIO(content))
+    else:
+        raise ValueError(f"Unsupported file format: {file_ext}")
+
 def extract_from_pdf(file_path):
     """Extract text and data from a PDF file"""
     try:
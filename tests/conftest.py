@@ -0,0 +1,13 @@
+import os
+import sys
+import tempfile
+
+# app.py reads its configuration at import time, so point it at a scratch
+# database and working directory before any test imports it
+_workdir = tempfile.mkdtemp(prefix="resumeats-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_workdir, 'test.db')}")
+os.environ.setdefault("SESSION_SECRET", "test-secret")
+os.environ.setdefault("BATCH_API_KEY", "test-api-key")
+os.chdir(_workdir)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
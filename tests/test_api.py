@@ -0,0 +1,89 @@
+import base64
+
+import pytest
+
+from app import app
+
+API_HEADERS = {"X-API-Key": "test-api-key"}
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+def post_batch(client, body, headers=API_HEADERS):
+    return client.post("/api/score", json=body, headers=headers)
+
+def test_requires_credentials(client):
+    response = post_batch(client, {"keywords": ["python"], "documents": [{"text": "x"}]}, headers={})
+    assert response.status_code == 401
+
+def test_rejects_wrong_and_non_ascii_keys(client):
+    for key in ("wrong-key", "é"):
+        response = post_batch(client, {"keywords": ["python"], "documents": [{"text": "x"}]},
+                              headers={"X-API-Key": key})
+        assert response.status_code == 401
+
+def test_accepts_api_key(client):
+    response = post_batch(client, {"keywords": ["python"], "documents": [5]})
+    assert response.status_code == 200
+    assert response.get_json()["results"] == [{"status": "error", "error": "Document must be a JSON object."}]
+
+# Values are raw JSON literals so NaN/Infinity reach the server the way a lenient client sends them
+@pytest.mark.parametrize("field, literal", [
+    ("batch_size", "true"),
+    ("batch_size", "2.5"),
+    ("batch_size", "NaN"),
+    ("batch_size", "0"),
+    ("batch_size", "-1"),
+    ("batch_size", '"4"'),
+    ("time_budget", "NaN"),
+    ("time_budget", "Infinity"),
+    ("time_budget", "0"),
+    ("time_budget", "false"),
+])
+def test_rejects_malformed_options(client, field, literal):
+    body = '{"keywords": ["python"], "documents": [{"text": "x"}], "%s": %s}' % (field, literal)
+    response = client.post("/api/score", data=body, content_type="application/json", headers=API_HEADERS)
+    assert response.status_code == 400
+    assert field in response.get_json()["error"]
+
+def test_rejects_empty_documents(client):
+    response = post_batch(client, {"keywords": ["python"], "documents": []})
+    assert response.status_code == 400
+
+def test_rejects_too_many_documents(client):
+    documents = [{"text": "x"}] * (app.config["BATCH_API_MAX_DOCUMENTS"] + 1)
+    response = post_batch(client, {"keywords": ["python"], "documents": documents})
+    assert response.status_code == 400
+
+def test_reports_per_document_errors(client):
+    docx_content = base64.b64encode(b"not really a resume").decode()
+    response = post_batch(client, {
+        "keywords": ["python"],
+        "documents": [
+            {"id": "bad-base64", "filename": "resume.pdf", "content": "not base64!"},
+            {"id": "bad-extension", "filename": "resume.txt", "content": docx_content},
+            "not an object",
+            {"id": "empty"},
+        ]
+    })
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert results[0] == {"id": "bad-base64", "status": "error", "error": "'content' is not valid base64"}
+    assert results[1] == {"id": "bad-extension", "status": "error", "error": "Unsupported file format: .txt"}
+    assert results[2] == {"status": "error", "error": "Document must be a JSON object."}
+    assert results[3] == {"id": "empty", "status": "error", "error": "Document must contain 'text' or 'content'"}
+
+def test_reports_timeout_when_budget_is_spent(client):
+    response = post_batch(client, {
+        "keywords": ["python"],
+        "time_budget": 1e-9,
+        "documents": [{"id": "a1", "text": "Jane Doe"}, {"id": "a2", "text": "John Doe"}]
+    })
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["timed_out"] == 2
+    assert data["results"] == [
+        {"id": "a1", "status": "timeout", "error": "Time budget exceeded."},
+        {"id": "a2", "status": "timeout", "error": "Time budget exceeded."},
+    ]
@@ -0,0 +1,81 @@
+import time
+from concurrent.futures import Future
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app import app, db
+from db_writer import WriteBatcher
+from models import User, JobPosting, Resume
+
+@pytest.fixture(scope="module")
+def job_posting_id():
+    with app.app_context():
+        job_posting = JobPosting(title="Engineer", description="Backend",
+                                 user=User(username="writer", email="writer@example.com", password_hash="x"))
+        db.session.add(job_posting)
+        db.session.commit()
+        return job_posting.id
+
+def make_resume(job_posting_id, filename):
+    return Resume(filename=filename, file_path=f"uploads/{filename}", job_posting_id=job_posting_id)
+
+def slow_writer(delay):
+    batcher = WriteBatcher(app, db)
+    write = batcher._write
+
+    def delayed_write(batch):
+        time.sleep(delay)
+        write(batch)
+
+    batcher._write = delayed_write
+    return batcher
+
+def test_submit_returns_committed_id(job_posting_id):
+    batcher = WriteBatcher(app, db)
+
+    resume_id = batcher.submit(make_resume(job_posting_id, "a.pdf"))
+
+    with app.app_context():
+        assert db.session.get(Resume, resume_id).filename == "a.pdf"
+
+def test_submit_waits_for_row_already_being_written(job_posting_id):
+    batcher = slow_writer(0.3)
+
+    # The timeout fires while the row is being written, so its id is still returned
+    resume_id = batcher.submit(make_resume(job_posting_id, "slow.pdf"), timeout=0.1)
+
+    with app.app_context():
+        assert db.session.get(Resume, resume_id).filename == "slow.pdf"
+
+def test_submit_times_out_and_drops_queued_row(job_posting_id):
+    batcher = slow_writer(0.5)
+    batcher._ensure_started()
+    # Keep the writer busy so the second row is still queued when its caller gives up
+    batcher._queue.put((make_resume(job_posting_id, "first.pdf"), Future()))
+    time.sleep(0.05)
+
+    with pytest.raises(TimeoutError):
+        batcher.submit(make_resume(job_posting_id, "dropped.pdf"), timeout=0.1)
+
+    time.sleep(0.8)
+    with app.app_context():
+        assert Resume.query.filter_by(filename="dropped.pdf").count() == 0
+
+def test_failed_row_does_not_fail_its_batch(job_posting_id):
+    batcher = WriteBatcher(app, db)
+
+    with pytest.raises(Exception):
+        batcher.submit(Resume(filename=None, file_path="uploads/none.pdf", job_posting_id=job_posting_id))
+    assert batcher.submit(make_resume(job_posting_id, "after.pdf"))
+    assert batcher._thread.is_alive()
+
+def test_pragmas_apply_only_to_app_engine(tmp_path):
+    with app.app_context():
+        with db.engine.connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+
+    other_engine = create_engine(f"sqlite:///{tmp_path / 'other.db'}")
+    with other_engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+    other_engine.dispose()
@@ -0,0 +1,106 @@
+import json
+import os
+
+import pytest
+from flask import Flask
+
+from profiler import RequestProfilerMiddleware, init_profiling
+
+def hello_app(environ, start_response):
+    start_response("201 CREATED", [("Content-Type", "text/plain")])
+    return [b"hello"]
+
+def failing_app(environ, start_response):
+    raise RuntimeError("boom")
+
+def make_environ(path="/resume/1", **headers):
+    environ = {"REQUEST_METHOD": "GET", "PATH_INFO": path, "REMOTE_ADDR": "203.0.113.9"}
+    environ.update({"HTTP_" + name.upper(): value for name, value in headers.items()})
+    return environ
+
+def call(middleware, environ):
+    """Run a request the way a WSGI server does: consume the body, then close it"""
+    app_iter = middleware(environ, lambda status, headers, exc_info=None: None)
+    try:
+        return b"".join(app_iter)
+    finally:
+        if hasattr(app_iter, "close"):
+            app_iter.close()
+
+def saved_files(profile_dir, extension):
+    return [name for name in os.listdir(profile_dir) if name.endswith(extension)]
+
+def test_disabled_profiling_leaves_app_unwrapped(tmp_path):
+    app = Flask(__name__)
+    app.config.update(PROFILING_ENABLED=False, PROFILING_DIR=str(tmp_path / "profiles"))
+    wsgi_app = app.wsgi_app
+
+    init_profiling(app)
+
+    assert app.wsgi_app == wsgi_app
+    assert not (tmp_path / "profiles").exists()
+
+def test_enabled_profiling_wraps_app(tmp_path):
+    app = Flask(__name__)
+    app.config.update(PROFILING_ENABLED=True, PROFILING_DIR=str(tmp_path), PROFILING_SAMPLE_RATE=0.0,
+                      PROFILING_HEADER="X-Profile", PROFILING_TOKEN="secret", PROFILING_SAMPLE_THREADS=False)
+
+    init_profiling(app)
+
+    assert isinstance(app.wsgi_app, RequestProfilerMiddleware)
+
+@pytest.mark.parametrize("token, header_value, expected", [
+    ("secret", "secret", True),
+    ("secret", "wrong", False),
+    ("secret", "é", False),
+    (None, "secret", False),
+])
+def test_header_requires_matching_token(tmp_path, token, header_value, expected):
+    middleware = RequestProfilerMiddleware(hello_app, str(tmp_path), token=token)
+
+    assert middleware.should_profile(make_environ(X_PROFILE=header_value)) is expected
+
+def test_profiled_request_writes_profile_and_metadata(tmp_path):
+    middleware = RequestProfilerMiddleware(hello_app, str(tmp_path), token="secret")
+
+    assert call(middleware, make_environ(X_PROFILE="secret")) == b"hello"
+
+    assert len(saved_files(tmp_path, ".prof")) == 1
+    [metadata_file] = saved_files(tmp_path, ".json")
+    with open(tmp_path / metadata_file) as f:
+        metadata = json.load(f)
+    assert metadata["status"] == "201 CREATED"
+    assert metadata["path"] == "/resume/1"
+    assert metadata["remote_addr"] == "203.0.113.9"
+
+def test_unprofiled_request_writes_nothing(tmp_path):
+    middleware = RequestProfilerMiddleware(hello_app, str(tmp_path), token="secret")
+
+    assert call(middleware, make_environ()) == b"hello"
+
+    assert os.listdir(tmp_path) == []
+
+def test_unsafe_path_is_sanitized_in_filename(tmp_path):
+    middleware = RequestProfilerMiddleware(hello_app, str(tmp_path), sample_rate=1.0)
+
+    call(middleware, make_environ(path="/a\x00b/" + "x" * 500))
+
+    [profile_file] = saved_files(tmp_path, ".prof")
+    assert "\x00" not in profile_file
+    assert len(profile_file) < 255
+
+def test_lock_released_after_close(tmp_path):
+    middleware = RequestProfilerMiddleware(hello_app, str(tmp_path), token="secret")
+
+    call(middleware, make_environ(X_PROFILE="secret"))
+
+    assert not middleware._lock.locked()
+
+def test_lock_released_when_app_raises(tmp_path):
+    middleware = RequestProfilerMiddleware(failing_app, str(tmp_path), token="secret")
+
+    with pytest.raises(RuntimeError):
+        call(middleware, make_environ(X_PROFILE="secret"))
+
+    assert not middleware._lock.locked()
+    assert len(saved_files(tmp_path, ".prof")) == 1
@@ -0,0 +1,172 @@
+"""
+Concurrency benchmark for the SQLite setup.
+
+Each configuration runs in a fresh interpreter (app.py reads its settings at
+import time) against a temporary SQLite file. N threads insert resumes
+through save_resume, which uses WriteBatcher.submit when batching is on, and
+optionally through the upload_resume view. The script can also be run on its
+own, e.g. SQLITE_TUNING=1 RESUME_WRITE_BATCHING=1 python tests/test_sqlite_concurrency.py
+"""
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+THREADS = 8
+INSERTS_PER_THREAD = 100
+UPLOADS_PER_THREAD = 10
+
+BASELINE_ENV = {"SQLITE_TUNING": "0", "RESUME_WRITE_BATCHING": "0"}
+# The shipped default: tuned connections, batching off
+TUNED_ENV = {"SQLITE_TUNING": "1", "RESUME_WRITE_BATCHING": "0"}
+BATCHED_ENV = {"SQLITE_TUNING": "1", "RESUME_WRITE_BATCHING": "1"}
+
+def _nltk_data_available():
+    try:
+        from nltk.tokenize import sent_tokenize
+        from nltk.corpus import stopwords
+        sent_tokenize("First sentence. Second sentence.")
+        stopwords.words("english")
+        return True
+    except (ImportError, LookupError):
+        return False
+
+def _run_threads(threads, work):
+    errors = []
+
+    def worker(thread_index):
+        try:
+            work(thread_index)
+        except Exception as e:
+            errors.append(str(e))
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return time.perf_counter() - start, errors
+
+def _docx_bytes(thread_index, upload_index):
+    import docx
+
+    document = docx.Document()
+    document.add_paragraph(f"Candidate {thread_index} {upload_index}")
+    document.add_paragraph(f"candidate{thread_index}.{upload_index}@example.com")
+    document.add_paragraph("Skills: Python, Flask, SQL")
+    stream = io.BytesIO()
+    document.save(stream)
+    return stream.getvalue()
+
+def run_benchmark(threads=THREADS, inserts_per_thread=INSERTS_PER_THREAD, uploads_per_thread=0):
+    """Insert resumes from concurrent threads and report throughput and errors"""
+    sys.path.insert(0, REPO_ROOT)
+    from app import app, db, save_resume
+    from models import User, JobPosting, Keyword, Resume
+
+    app.config["WTF_CSRF_ENABLED"] = False
+
+    with app.app_context():
+        user = User(username="bench", email="bench@example.com", password_hash="x")
+        job_posting = JobPosting(title="Engineer", description="Backend", user=user,
+                                 keywords=[Keyword(word="python"), Keyword(word="flask")])
+        db.session.add(job_posting)
+        db.session.commit()
+        user_id, job_posting_id = user.id, job_posting.id
+
+    results = {}
+
+    def insert_resumes(thread_index):
+        for i in range(inserts_per_thread):
+            # Each insert gets its own app context, like a request would
+            with app.app_context():
+                save_resume(Resume(
+                    filename=f"resume_{thread_index}_{i}.pdf",
+                    file_path=f"uploads/resume_{thread_index}_{i}.pdf",
+                    candidate_name=f"Candidate {thread_index} {i}",
+                    content="python flask sql " * 200,
+                    skills=["python", "flask"],
+                    score=50.0,
+                    job_posting_id=job_posting_id
+                ))
+
+    elapsed, errors = _run_threads(threads, insert_resumes)
+    results["inserts"] = {
+        "count": threads * inserts_per_thread - len(errors),
+        "per_second": (threads * inserts_per_thread - len(errors)) / elapsed,
+        "errors": errors
+    }
+
+    if uploads_per_thread:
+        def upload_resumes(thread_index):
+            client = app.test_client()
+            with client.session_transaction() as session:
+                session["_user_id"] = str(user_id)
+                session["_fresh"] = True
+            for i in range(uploads_per_thread):
+                response = client.post("/upload", content_type="multipart/form-data", data={
+                    "job_posting": str(job_posting_id),
+                    "resume": (io.BytesIO(_docx_bytes(thread_index, i)), f"resume_{thread_index}_{i}.docx")
+                })
+                if "/resume/" not in response.headers.get("Location", ""):
+                    with client.session_transaction() as session:
+                        messages = [message for _, message in session.get("_flashes", [])]
+                    raise RuntimeError(f"Upload failed: {messages or response.status}")
+
+        elapsed, errors = _run_threads(threads, upload_resumes)
+        with app.app_context():
+            uploaded = Resume.query.filter(Resume.filename.like("%.docx")).count()
+        results["uploads"] = {
+            "count": uploaded,
+            "per_second": uploaded / elapsed,
+            "errors": errors
+        }
+
+    return results
+
+def _run_in_subprocess(tmp_path, env_overrides, uploads_per_thread=0):
+    workdir = tmp_path / f"tuning{env_overrides['SQLITE_TUNING']}-batching{env_overrides['RESUME_WRITE_BATCHING']}"
+    workdir.mkdir()
+    env = dict(os.environ, **env_overrides)
+    env["DATABASE_URL"] = f"sqlite:///{workdir / 'bench.db'}"
+    env["SESSION_SECRET"] = "benchmark"
+    env["BENCH_UPLOADS_PER_THREAD"] = str(uploads_per_thread)
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__)],
+        cwd=workdir, env=env, capture_output=True, text=True, timeout=600
+    )
+    assert output.returncode == 0, output.stderr[-2000:]
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+def test_tuned_sqlite_sustains_more_inserts(tmp_path):
+    baseline = _run_in_subprocess(tmp_path, BASELINE_ENV)["inserts"]
+
+    for env in (TUNED_ENV, BATCHED_ENV):
+        tuned = _run_in_subprocess(tmp_path, env)["inserts"]
+
+        assert tuned["errors"] == [], env
+        assert tuned["count"] == THREADS * INSERTS_PER_THREAD, env
+        assert tuned["per_second"] > baseline["per_second"], (env, baseline, tuned)
+
+@pytest.mark.skipif(not _nltk_data_available(), reason="NLTK punkt/stopwords data is not installed")
+def test_tuned_sqlite_sustains_more_uploads(tmp_path):
+    baseline = _run_in_subprocess(tmp_path, BASELINE_ENV, UPLOADS_PER_THREAD)["uploads"]
+
+    for env in (TUNED_ENV, BATCHED_ENV):
+        tuned = _run_in_subprocess(tmp_path, env, UPLOADS_PER_THREAD)["uploads"]
+
+        assert tuned["errors"] == [], env
+        assert tuned["count"] == THREADS * UPLOADS_PER_THREAD, env
+        assert tuned["per_second"] > baseline["per_second"], (env, baseline, tuned)
+
+if __name__ == "__main__":
+    uploads = int(os.environ.get("BENCH_UPLOADS_PER_THREAD", 0))
+    print(json.dumps(run_benchmark(uploads_per_thread=uploads)))